@@ -6,47 +6,200 @@
 # License: GNU General Public License v3.0
 # =============================================================================
 
+import os
+import io
 import sys
 import json
 import time
+import base64
+import socket
+import asyncio
 import argparse
+import contextlib
 from pathlib import Path
 
-import socketio
-
 # -----------------------------------------------------------------------------
 # Globals
 # -----------------------------------------------------------------------------
-sio = socketio.Client()
+# socketio pulls in engineio and aiohttp - 100-200ms of import time - so it is
+# imported (and the client built) only once a command actually talks to the
+# server: --help, argparse errors and the daemon thin-client path all exit
+# without paying it. make_client() rebinds both names.
+socketio = None
+sio = None
+# Updated in place (never rebound) so every reader sees the same dict; the
+# version counter lets all_http_monitors() know when its scan is stale.
 monitor_list = {}
+_monitor_list_version = 0
 authenticated = False
 config = {}
 
 
+def make_client(reconnection=True):
+    """Import socketio and build the wired-up client (see note above).
+
+    Daemon mode passes reconnection=False: Kuma auth is per-connection, so an
+    automatic reconnect would leave a connected-but-unauthenticated socket -
+    better to let the daemon notice the disconnect and exit (see cmd_daemon).
+    """
+    global socketio, sio
+    import socketio
+
+    # orjson (optional) decodes the monitorList payload - megabytes of JSON
+    # on instances with thousands of monitors - several times faster than
+    # stdlib json, and speeds up encoding of each add/edit payload.
+    # python-socketio accepts any module-like object exposing dumps/loads;
+    # fall back to stdlib json when orjson isn't installed.
+    try:
+        import orjson
+
+        class _OrjsonSerializer:
+            @staticmethod
+            def dumps(obj, **kwargs):
+                return orjson.dumps(obj).decode()
+
+            @staticmethod
+            def loads(data, **kwargs):
+                return orjson.loads(data)
+
+        sio_json = _OrjsonSerializer
+    except ImportError:
+        sio_json = json
+
+    # compress=15 is merged into aiohttp's ws_connect() kwargs by engineio,
+    # negotiating permessage-deflate: the large monitorList push and the
+    # repetitive add/edit JSON compress well (~4x). TCP_NODELAY needs no
+    # tuning - aiohttp enables it on every connection.
+    sio = socketio.AsyncClient(json=sio_json, reconnection=reconnection,
+                               websocket_extra_options={"compress": 15})
+    sio.on("connect", on_connect)
+    sio.on("disconnect", on_disconnect)
+    sio.on("monitorList", on_monitor_list)
+    sio.on("notificationList", on_notification_list)
+    return sio
+
+# Cap on concurrent in-flight Socket.io calls during bulk operations, so a big
+# sync doesn't flood the Kuma server. Created lazily (needs a running loop).
+BULK_CONCURRENCY = 16
+_bulk_sem = None
+
+
+def bulk_semaphore():
+    global _bulk_sem
+    if _bulk_sem is None:
+        _bulk_sem = asyncio.Semaphore(BULK_CONCURRENCY)
+    return _bulk_sem
+
+
+# Signaled by on_monitor_list so startup can wait for the server's initial
+# monitor push instead of sleeping a fixed second. Created lazily like the
+# semaphore above.
+_monitor_list_event = None
+
+
+def monitor_list_event():
+    global _monitor_list_event
+    if _monitor_list_event is None:
+        _monitor_list_event = asyncio.Event()
+    return _monitor_list_event
+
+
+async def wait_for_monitor_list(timeout=10, settle=0.1):
+    """Wait until the server has pushed the monitor list.
+
+    The server may send several monitorList events in quick succession during
+    initial sync, so after the first one we keep absorbing further pushes
+    until none arrives for `settle` seconds.
+    """
+    ev = monitor_list_event()
+    try:
+        await asyncio.wait_for(ev.wait(), timeout)
+    except asyncio.TimeoutError:
+        print(f"  WARNING: No monitorList push received within {timeout}s, "
+              "proceeding with the current list")
+        return
+    while True:
+        ev.clear()
+        try:
+            await asyncio.wait_for(ev.wait(), settle)
+        except asyncio.TimeoutError:
+            return
+
+
+# -----------------------------------------------------------------------------
+# Buffered progress output
+# -----------------------------------------------------------------------------
+# Per-monitor progress lines in the bulk loops each cost a write() syscall
+# when printed directly - thousands of them on a big sync, serialized with the
+# Socket.io work. Buffer them and flush in chunks; errors and warnings keep
+# using print so they show up immediately. Commands must flush_log() before
+# printing their own summaries to keep output ordered.
+_LOG_FLUSH_EVERY = 64
+_log_buf = []
+
+
+def log_line(msg):
+    _log_buf.append(msg)
+    if len(_log_buf) >= _LOG_FLUSH_EVERY:
+        flush_log()
+
+
+def flush_log():
+    if _log_buf:
+        sys.stdout.write("\n".join(_log_buf) + "\n")
+        _log_buf.clear()
+
+
 # -----------------------------------------------------------------------------
-# Socket.io Event Handlers
+# Socket.io Event Handlers (registered on the client by make_client)
 # -----------------------------------------------------------------------------
-@sio.event
-def connect():
+async def on_connect():
     print("  Connected to Uptime Kuma")
 
 
-@sio.event
-def disconnect():
+async def on_disconnect():
     print("  Disconnected from Uptime Kuma")
 
 
-@sio.on("monitorList")
-def on_monitor_list(data):
-    global monitor_list
-    monitor_list = data
+async def on_monitor_list(data):
+    global _monitor_list_version
+    # Kuma has no server-side filter for this event: it pushes every monitor
+    # on the instance, which on a shared Kuma hosting thousands of unrelated
+    # monitors is mostly ballast. Filter here so the raw payload is discarded
+    # as soon as it's decoded instead of staying resident. Kept: group beans
+    # (group resolution, --info), HTTP monitors, and non-HTTP children of
+    # off-server groups - without those the empty-group cleanup could mistake
+    # a group holding a manually created monitor for an empty one. Keys are
+    # stringified ids in the payload; cast once at ingest.
+    label = offserver_group_label()
+    keep = {}
+    off_ids = set()
+    for k, m in data.items():
+        mtype = m.get("type")
+        if mtype == "group":
+            mid = int(k)
+            keep[mid] = m
+            nm = m.get("name", "")
+            if nm == label or nm.endswith(" " + label):
+                off_ids.add(mid)
+        elif mtype == "http":
+            keep[int(k)] = m
+    if off_ids:
+        for k, m in data.items():
+            mid = int(k)
+            if mid not in keep and m.get("parent") in off_ids:
+                keep[mid] = m
+
+    monitor_list.clear()
+    monitor_list.update(keep)
+    _monitor_list_version += 1
+    monitor_list_event().set()
 
 
 notification_list = {}
 
 
-@sio.on("notificationList")
-def on_notification_list(data):
+async def on_notification_list(data):
     global notification_list
     notification_list = data
 
@@ -54,15 +207,85 @@ def on_notification_list(data):
 # -----------------------------------------------------------------------------
 # Authentication
 # -----------------------------------------------------------------------------
-_login_response = None
-_login_event = None
+# Minimum remaining JWT validity before the cached token is considered usable.
+# Below this we go straight to password login instead of burning a round trip
+# (and a retry cycle) on a loginByToken that is bound to be rejected.
+JWT_MIN_REMAINING = 600
 
 
-def authenticate():
-    global authenticated, _login_response, _login_event
+def _jwt_exp(token):
+    """The JWT's exp claim (unix time), decoded locally without verification.
+
+    Returns None when the token carries no exp (Kuma tokens are non-expiring
+    by default) and 0 when the token is unreadable.
+    """
+    try:
+        payload = token.split(".")[1]
+        payload = base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        exp = json.loads(payload).get("exp")
+        return int(exp) if exp is not None else None
+    except Exception:
+        return 0
 
-    import threading
-    _login_event = threading.Event()
+
+def load_cached_token():
+    """Cached JWT from a previous login, or None if absent or expiring soon.
+
+    The expiry is kept in a sidecar file (<token_file>.exp) written at save
+    time, so the token doesn't need re-decoding on every invocation.
+    """
+    token_file = config.get("token_file")
+    if not token_file:
+        return None
+    path = Path(token_file)
+    try:
+        token = path.read_text().strip()
+    except OSError:
+        return None
+    if not token:
+        return None
+
+    exp_path = Path(token_file + ".exp")
+    try:
+        exp = int(exp_path.read_text().strip())
+    except (OSError, ValueError):
+        exp = _jwt_exp(token)
+
+    if exp == 0:
+        return None  # unreadable token
+    if exp is not None and exp - time.time() < JWT_MIN_REMAINING:
+        return None
+    return token
+
+
+def save_cached_token(token):
+    token_file = config.get("token_file")
+    if not token_file or not token:
+        return
+    try:
+        path = Path(token_file)
+        path.write_text(token)
+        path.chmod(0o600)
+        exp = _jwt_exp(token)
+        if exp:
+            Path(token_file + ".exp").write_text(str(exp))
+    except OSError as e:
+        print(f"  WARNING: Could not cache login token: {e}")
+
+
+def clear_cached_token():
+    token_file = config.get("token_file")
+    if not token_file:
+        return
+    for p in (Path(token_file), Path(token_file + ".exp")):
+        try:
+            p.unlink()
+        except OSError:
+            pass
+
+
+async def authenticate():
+    global authenticated
 
     username = config.get("username", "")
     password = config.get("password", "")
@@ -71,49 +294,62 @@ def authenticate():
         print("ERROR: No username/password configured")
         sys.exit(1)
 
+    # Fast path: reuse the JWT from a previous login (Kuma auth is
+    # per-connection, so the loginByToken round trip itself is unavoidable,
+    # but it skips the server-side password hashing and rate limiting).
+    token = load_cached_token()
+    if token:
+        print("  Authenticating with cached token...")
+        try:
+            response = await sio.call("loginByToken", token,
+                                      timeout=config.get("login_timeout", 15))
+        except socketio.exceptions.TimeoutError:
+            response = None
+        if response and response.get("ok"):
+            print("  Login successful")
+            authenticated = True
+            return True
+        clear_cached_token()
+        print("  Cached token rejected, falling back to password login...")
+
+    response = None
     max_retries = 3
     for attempt in range(1, max_retries + 1):
         print(f"  Authenticating (attempt {attempt}/{max_retries})...")
-        _login_response = None
-        _login_event.clear()
-
-        def on_login_response(data):
-            global _login_response
-            _login_response = data
-            _login_event.set()
-
-        sio.emit("login", {
-            "username": username,
-            "password": password,
-            "token": ""
-        }, callback=on_login_response)
-
-        _login_event.wait(timeout=config.get("login_timeout", 15))
-
-        if _login_response and _login_response.get("ok"):
+        try:
+            response = await sio.call("login", {
+                "username": username,
+                "password": password,
+                "token": ""
+            }, timeout=config.get("login_timeout", 15))
+        except socketio.exceptions.TimeoutError:
+            response = None
+
+        if response and response.get("ok"):
             print("  Login successful")
             authenticated = True
+            save_cached_token(response.get("token"))
             return True
 
         if attempt < max_retries:
             print("  Login failed, reconnecting...")
             try:
-                sio.disconnect()
-                time.sleep(1)
-                sio.connect(config["url"], transports=["websocket"])
-                time.sleep(2)
+                await sio.disconnect()
+                await asyncio.sleep(1)
+                await sio.connect(config["url"], transports=["websocket"])
+                await asyncio.sleep(2)
             except Exception as e:
                 print(f"  WARNING: Reconnect error: {e}")
-                time.sleep(2)
+                await asyncio.sleep(2)
 
-    msg = _login_response.get("msg", "Unknown error") if _login_response else "No response (timeout)"
+    msg = response.get("msg", "Unknown error") if response else "No response (timeout)"
     print(f"ERROR: Authentication failed after {max_retries} attempts: {msg}")
     sys.exit(1)
 
 
-def call_with_callback(event, data, timeout=30):
+async def call_with_callback(event, data, timeout=30):
     try:
-        response = sio.call(event, data, timeout=timeout)
+        response = await sio.call(event, data, timeout=timeout)
         return response
     except socketio.exceptions.TimeoutError:
         print(f"  WARNING: Timeout waiting for {event} response")
@@ -141,11 +377,14 @@ def load_domains():
         print(f"ERROR: Domains file not found: {config['domains_file']}")
         sys.exit(1)
 
-    for line in path.read_text().strip().split("\n"):
-        if not line.strip():
-            continue
-        parts = line.split("\t")
-        if len(parts) >= 3:
+    # Streamed line by line: no whole-file copy, no intermediate line list
+    # (the file grows with the fleet). The split stays tab-bound because the
+    # reseller column is legitimately empty for admin/direct domains.
+    with path.open() as f:
+        for line in f:
+            parts = line.rstrip("\n").split("\t", 5)
+            if len(parts) < 3 or not parts[0]:
+                continue
             name = parts[0]
             url = parts[2]
             reseller = parts[3] if len(parts) >= 4 else ""
@@ -187,7 +426,7 @@ def is_tool_paused_name(name):
 # -----------------------------------------------------------------------------
 # Off-server detection (DNS)
 # -----------------------------------------------------------------------------
-def resolve_states(names):
+async def resolve_states(names):
     """Classify each domain against the server's local IPs.
 
     Returns {name: "on"|"off"|"unknown"}:
@@ -197,7 +436,8 @@ def resolve_states(names):
 
     Resolution goes through the configured public resolver (DNS_RESOLVER) so a
     Plesk box that is itself the DNS master for the zone does not just answer
-    with its own local IP. Done in parallel for speed on large fleets.
+    with its own local IP. Lookups run in a thread pool (dnspython is blocking)
+    so the event loop - and Socket.io heartbeats - keep running meanwhile.
     """
     import concurrent.futures
     import ipaddress
@@ -245,11 +485,11 @@ def resolve_states(names):
         # transient failure so cleanup can act on it (pause) without flapping.
         return name, "nxdomain"
 
-    states = {}
+    loop = asyncio.get_event_loop()
     with concurrent.futures.ThreadPoolExecutor(max_workers=20) as pool:
-        for name, state in pool.map(classify, names):
-            states[name] = state
-    return states
+        results = await asyncio.gather(
+            *(loop.run_in_executor(pool, classify, name) for name in names))
+    return dict(results)
 
 
 # -----------------------------------------------------------------------------
@@ -257,14 +497,14 @@ def resolve_states(names):
 # -----------------------------------------------------------------------------
 def find_group_by_name(name):
     """Return [ids] of group monitors with the given name."""
-    return [int(mid) for mid, m in monitor_list.items()
+    return [mid for mid, m in monitor_list.items()
             if m.get("type") == "group" and m.get("name") == name]
 
 
 _reseller_group_cache = {}
 
 
-def reseller_group_id(reseller, create=False, dry_run=False):
+async def reseller_group_id(reseller, create=False, dry_run=False):
     """Resolve (and optionally create) the Kuma group for a reseller login.
 
     Group name = RESELLER_GROUP_PREFIX + reseller login. Cached per run.
@@ -285,7 +525,7 @@ def reseller_group_id(reseller, create=False, dry_run=False):
         else:
             parent = config.get("reseller_group_parent")
             parent = int(parent) if parent not in (None, "", 0) else None
-            gid = create_group(name, parent)
+            gid = await create_group(name, parent)
 
     if gid is not None:
         _reseller_group_cache[reseller] = gid
@@ -315,13 +555,13 @@ def group_lookup(spec):
     return main_gid, "main group"
 
 
-def ensure_group(spec):
+async def ensure_group(spec):
     """Resolve an owner group spec, creating the group if needed; return its id."""
     gid, _ = group_lookup(spec)
     if gid is not None:
         return gid
     if spec[0] == "reseller":
-        return reseller_group_id(spec[1], create=True)
+        return await reseller_group_id(spec[1], create=True)
     return config["parent_group_id"]
 
 
@@ -358,11 +598,11 @@ def offserver_group_ids():
         if m.get("type") == "group":
             nm = m.get("name", "")
             if nm == label or nm.endswith(" " + label):
-                ids.add(int(mid))
+                ids.add(mid)
     return ids
 
 
-def offserver_group_for(info, create=False, dry_run=False):
+async def offserver_group_for(info, create=False, dry_run=False):
     """Target off-server group for a domain (move action) -> (gid_or_None, label).
 
     A top-level group named per owner ("<reseller> Off-server"). Cached per run
@@ -385,7 +625,7 @@ def offserver_group_for(info, create=False, dry_run=False):
     if create and not dry_run:
         parent = config.get("offserver_group_parent")
         parent = int(parent) if parent not in (None, "", 0) else None
-        gid = create_group(name, parent)
+        gid = await create_group(name, parent)
         if gid is not None:
             _offserver_group_cache[name] = gid
         return gid, f"group '{name}'"
@@ -393,45 +633,62 @@ def offserver_group_for(info, create=False, dry_run=False):
     return None, f"group '{name}'"
 
 
-def home_group_id(info, create=False, dry_run=False):
+async def home_group_id(info, create=False, dry_run=False):
     """Resolve the owner group id for a domain (used when creating monitors)."""
     spec = owner_group_spec(info)
     if create and not dry_run:
-        return ensure_group(spec)
+        return await ensure_group(spec)
     gid, _ = group_lookup(spec)
     return gid if gid is not None else config["parent_group_id"]
 
 
+_http_monitors_cache = None
+_http_monitors_version = -1
+
+
 def all_http_monitors():
     """All HTTP monitors keyed by their suffix-stripped name (across all groups).
 
     Used to match domains to monitors regardless of which group they sit in, so
     grouping moves and the off-server name suffix never produce duplicates.
+    Cached against the monitor-list version: the server re-pushes monitorList
+    after every add/delete during a bulk sync, and without the version check
+    each push would trigger a full rescan (O(N^2) over a whole sync).
     """
+    global _http_monitors_cache, _http_monitors_version
+    if _http_monitors_version == _monitor_list_version:
+        return _http_monitors_cache
+
     out = {}
     for monitor_id, monitor in monitor_list.items():
-        if monitor.get("type") != "http":
+        try:
+            if monitor["type"] != "http":
+                continue
+            raw = monitor["name"]
+        except KeyError:
             continue
-        raw = monitor["name"]
         out[strip_suffix(raw)] = {
-            "id": int(monitor_id),
+            "id": monitor_id,
             "url": monitor.get("url", ""),
             "parent": monitor.get("parent"),
             "active": monitor.get("active", True),
             "name_raw": raw,
             "bean": monitor,
         }
+    _http_monitors_cache = out
+    _http_monitors_version = _monitor_list_version
     return out
 
 
-def create_group(name, parent=None):
+async def create_group(name, parent=None):
+    # resendInterval omitted (column default); see monitor_template() for why
+    # the conditions/kafka/rabbitmq fields are kept even on a group.
     group_data = {
         "name": name,
         "type": "group",
         "interval": 60,
         "retryInterval": 60,
         "maxretries": 0,
-        "resendInterval": 0,
         "active": True,
         "parent": parent,
         "notificationIDList": {},
@@ -441,7 +698,7 @@ def create_group(name, parent=None):
         "rabbitmqNodes": [],
         "kafkaProducerSaslOptions": {"mechanism": "None"},
     }
-    response = call_with_callback("add", group_data)
+    response = await call_with_callback("add", group_data)
     if response and response.get("ok"):
         gid = int(response.get("monitorID"))
         print(f"  Created group '{name}' (ID: {gid})")
@@ -451,7 +708,7 @@ def create_group(name, parent=None):
     return None
 
 
-def edit_monitor(bean, **changes):
+async def edit_monitor(bean, **changes):
     """Apply field changes to an existing monitor via editMonitor.
 
     Sends the full existing bean (so unrelated settings are preserved) with the
@@ -459,7 +716,7 @@ def edit_monitor(bean, **changes):
     """
     payload = dict(bean)
     payload.update(changes)
-    response = call_with_callback("editMonitor", payload)
+    response = await call_with_callback("editMonitor", payload)
     if response and response.get("ok"):
         return True
     msg = response.get("msg", "Unknown error") if response else "No response"
@@ -467,43 +724,66 @@ def edit_monitor(bean, **changes):
     return False
 
 
-def create_monitor(name, url, parent_gid=None):
-    notif_list = {str(nid): True for nid in config["notification_ids"]}
+_monitor_template = None
+
+
+def monitor_template():
+    """Invariant part of the 'add' payload, built once per run.
+
+    Everything except name/url/parent is identical for all monitors created
+    in a run - including the notification map, which used to be rebuilt (with
+    its str() casts) on every call - so a bulk sync reuses one template
+    instead of rebuilding ~20 fields per domain. Never mutated after
+    serialization.
+
+    resendInterval and packetSize are omitted (real column defaults server
+    side); the conditions/kafka/rabbitmq fields stay because Kuma's add
+    handler JSON.stringify's them unconditionally before bean.import and
+    omitting them is not verified safe across versions.
+    """
+    global _monitor_template
+    if _monitor_template is None:
+        _monitor_template = {
+            "type": "http",
+            "method": "GET",
+            "interval": config["monitor_interval"],
+            "retryInterval": config["monitor_retry_interval"],
+            "timeout": config["monitor_timeout"],
+            "maxretries": config["monitor_max_retries"],
+            "maxredirects": config["monitor_max_redirects"],
+            "active": True,
+            "accepted_statuscodes": ["200-299"],
+            "expiryNotification": True,
+            "domainExpiryNotification": False,
+            "ignoreTls": False,
+            "upsideDown": False,
+            "httpBodyEncoding": "json",
+            "conditions": [],
+            "kafkaProducerBrokers": [],
+            "rabbitmqNodes": [],
+            "kafkaProducerSaslOptions": {"mechanism": "None"},
+            "notificationIDList": {str(nid): True
+                                   for nid in config["notification_ids"]},
+        }
+    return _monitor_template
+
+
+async def create_monitor(name, url, parent_gid=None):
     if parent_gid is None:
         parent_gid = config["parent_group_id"]
 
     monitor_data = {
+        **monitor_template(),
         "name": name,
-        "type": "http",
         "url": url,
-        "method": "GET",
-        "interval": config["monitor_interval"],
-        "retryInterval": config["monitor_retry_interval"],
-        "timeout": config["monitor_timeout"],
-        "maxretries": config["monitor_max_retries"],
-        "maxredirects": config["monitor_max_redirects"],
-        "resendInterval": 0,
-        "active": True,
         "parent": parent_gid,
-        "notificationIDList": notif_list,
-        "accepted_statuscodes": ["200-299"],
-        "expiryNotification": True,
-        "domainExpiryNotification": False,
-        "ignoreTls": False,
-        "upsideDown": False,
-        "packetSize": 56,
-        "httpBodyEncoding": "json",
-        "conditions": [],
-        "kafkaProducerBrokers": [],
-        "rabbitmqNodes": [],
-        "kafkaProducerSaslOptions": {"mechanism": "None"},
     }
 
-    response = call_with_callback("add", monitor_data)
+    response = await call_with_callback("add", monitor_data)
 
     if response and response.get("ok"):
         monitor_id = response.get("monitorID", "?")
-        print(f"  Created: {name} -> {url} (ID: {monitor_id})")
+        log_line(f"  Created: {name} -> {url} (ID: {monitor_id})")
         return True
     else:
         msg = response.get("msg", "Unknown error") if response else "No response"
@@ -511,11 +791,11 @@ def create_monitor(name, url, parent_gid=None):
         return False
 
 
-def delete_monitor(monitor_id, name):
-    response = call_with_callback("deleteMonitor", monitor_id)
+async def delete_monitor(monitor_id, name):
+    response = await call_with_callback("deleteMonitor", monitor_id)
 
     if response and response.get("ok"):
-        print(f"  Deleted: {name} (ID: {monitor_id})")
+        log_line(f"  Deleted: {name} (ID: {monitor_id})")
         return True
     else:
         msg = response.get("msg", "Unknown error") if response else "No response"
@@ -523,20 +803,41 @@ def delete_monitor(monitor_id, name):
         return False
 
 
-def pause_monitor(monitor_id):
-    response = call_with_callback("pauseMonitor", monitor_id)
+async def delete_monitors_bulk(targets):
+    """Delete many monitors concurrently instead of one round trip at a time.
+
+    Confirmed deleteMonitor calls fired under the shared semaphore, the same
+    pattern cmd_sync uses for creates. (Kuma's delete handler invokes its ack
+    callback unconditionally, so a callback-less emit makes the handler throw
+    server-side - fire-and-forget is not an option here.) Returns the number
+    of monitors deleted.
+
+    `targets` is a list of (monitor_id, name) tuples.
+    """
+    async def delete_one(monitor_id, name):
+        async with bulk_semaphore():
+            return await delete_monitor(monitor_id, name)
+
+    results = await asyncio.gather(
+        *(delete_one(monitor_id, name) for monitor_id, name in targets))
+    flush_log()
+    return sum(1 for ok in results if ok)
+
+
+async def pause_monitor(monitor_id):
+    response = await call_with_callback("pauseMonitor", monitor_id)
     return bool(response and response.get("ok"))
 
 
-def resume_monitor(monitor_id):
-    response = call_with_callback("resumeMonitor", monitor_id)
+async def resume_monitor(monitor_id):
+    response = await call_with_callback("resumeMonitor", monitor_id)
     return bool(response and response.get("ok"))
 
 
 # -----------------------------------------------------------------------------
 # Commands
 # -----------------------------------------------------------------------------
-def cmd_sync(dry_run=False):
+async def cmd_sync(dry_run=False):
     """Synchronise Kuma with Plesk: create missing monitors and place every
     monitor in its owner group (the grouping reconciliation lives here, not in
     cleanup). Monitors the tool paused (off-server/suspended, carrying a managed
@@ -551,7 +852,7 @@ def cmd_sync(dry_run=False):
     suspended_action = config.get("suspended_action", "keep")
     offserver_action = config.get("offserver_action", "report")
     main_gid = config["parent_group_id"]
-    group_names = {int(mid): m.get("name", "?") for mid, m in monitor_list.items()
+    group_names = {mid: m.get("name", "?") for mid, m in monitor_list.items()
                    if m.get("type") == "group"}
 
     def cur_label(parent):
@@ -560,17 +861,17 @@ def cmd_sync(dry_run=False):
         return f"'{group_names.get(parent, '#%s' % parent)}'"
 
     # --- 1) Which missing domains to create ---
+    missing = domains.keys() - existing.keys()
     candidates = {
-        name: info for name, info in domains.items()
-        if name not in existing
-        and not (info["status"] in SUSPENDED_STATUSES and suspended_action == "delete")
+        name: domains[name] for name in missing
+        if not (domains[name]["status"] in SUSPENDED_STATUSES and suspended_action == "delete")
     }
     # Only create domains that resolve to THIS server. Skip off-server and
     # unresolved/NXDOMAIN domains (monitoring something that doesn't point here
     # is pointless; it'll be created once it resolves to us).
     creates, skip_off, skip_unresolved = {}, [], []
     if candidates and offserver_action != "off":
-        states = resolve_states(list(candidates))
+        states = await resolve_states(list(candidates))
         for name, info in candidates.items():
             st = states.get(name, "unknown")
             if st == "on":
@@ -617,32 +918,39 @@ def cmd_sync(dry_run=False):
         print(f"\nTotal: {len(creates)} to create, {len(regroups)} to regroup")
         return
 
-    created = 0
+    # Resolve/create owner groups serially first (cached per run, and racing
+    # group creation would duplicate groups), then fire all monitor creates
+    # concurrently - bounded by the semaphore so the server isn't flooded.
+    async def create_one(name, url, gid):
+        async with bulk_semaphore():
+            return await create_monitor(name, url, gid)
+
+    tasks = []
     for name, info in sorted(creates.items()):
-        gid = home_group_id(info, create=True)
-        if create_monitor(name, info["url"], gid):
-            created += 1
-        time.sleep(0.2)
+        gid = await home_group_id(info, create=True)
+        tasks.append(create_one(name, info["url"], gid))
+    results = await asyncio.gather(*tasks)
+    created = sum(1 for ok in results if ok)
 
     moved = 0
     for name, spec, label, cur in sorted(regroups):
-        gid = ensure_group(spec)
+        gid = await ensure_group(spec)
         mon = existing[name]
-        if gid is not None and gid != mon["parent"] and edit_monitor(mon["bean"], parent=gid):
-            print(f"  Moved: {name} {cur} -> {label}")
+        if gid is not None and gid != mon["parent"] and await edit_monitor(mon["bean"], parent=gid):
+            log_line(f"  Moved: {name} {cur} -> {label}")
             moved += 1
-            time.sleep(0.2)
 
+    flush_log()
     print()
     print(f"Created: {created} monitor(s), regrouped: {moved}")
 
 
-def cmd_list():
+async def cmd_list():
     print("=== HTTP monitors ===")
     existing = all_http_monitors()
 
     # Map group IDs to names for readable output
-    group_names = {int(mid): m.get("name", "?") for mid, m in monitor_list.items()
+    group_names = {mid: m.get("name", "?") for mid, m in monitor_list.items()
                    if m.get("type") == "group"}
 
     for name, data in sorted(existing.items()):
@@ -654,7 +962,7 @@ def cmd_list():
     print(f"\nTotal: {len(existing)} monitor(s)")
 
 
-def cmd_cleanup(dry_run=False):
+async def cmd_cleanup(dry_run=False):
     label = "Cleanup preview (dry-run)" if dry_run else "Cleanup"
     print(f"=== {label} ===")
 
@@ -666,48 +974,50 @@ def cmd_cleanup(dry_run=False):
     managed = {main_gid}
     managed |= offserver_group_ids()
     for reseller in {info["reseller"] for info in domains.values() if info["reseller"]}:
-        gid = reseller_group_id(reseller, create=False)
+        gid = await reseller_group_id(reseller, create=False)
         if gid is not None:
             managed.add(gid)
 
     # --- 1) Obsolete: managed monitor whose domain is gone from Plesk -> delete ---
-    obsolete = [(m["id"], key, m["url"]) for key, m in existing.items()
-                if key not in domains and m["parent"] in managed]
+    obsolete = [(existing[key]["id"], key, existing[key]["url"])
+                for key in existing.keys() - domains.keys()
+                if existing[key]["parent"] in managed]
     if obsolete:
-        for mid, key, url in obsolete:
-            if dry_run:
+        if dry_run:
+            for mid, key, url in obsolete:
                 print(f"  Would delete (obsolete): [{mid}] {key} - {url}")
-            elif delete_monitor(mid, key):
-                time.sleep(0.2)
+        else:
+            await delete_monitors_bulk([(mid, key) for mid, key, _ in obsolete])
     else:
         print("  No obsolete monitors")
 
     # --- 2) Resolve off-server DNS state for domains still in Plesk ---
     offserver_action = config.get("offserver_action", "report")
-    present = [n for n in domains if n in existing]
+    present = domains.keys() & existing.keys()
     if offserver_action != "off":
         print(f"\n=== Off-server / suspended ({len(present)} monitors, off-server action: {offserver_action}) ===")
-        states = resolve_states(present)
+        states = await resolve_states(present)
     else:
         states = {n: "unknown" for n in present}
 
     # --- 3) Off-server + suspended state (NOT owner-grouping, that is sync's job) ---
     changed = 0
     for name in sorted(present):
-        if reconcile_state(name, domains[name], existing[name],
-                           states.get(name, "unknown"), dry_run):
+        if await reconcile_state(name, domains[name], existing[name],
+                                 states.get(name, "unknown"), dry_run):
             changed += 1
             if not dry_run:
-                time.sleep(0.2)
+                await asyncio.sleep(0.2)
 
+    flush_log()
     if not dry_run:
         print(f"\nState changes: {changed} monitor(s)")
 
     # --- 4) Delete now-empty off-server groups ---
-    cleanup_empty_offserver_groups(dry_run)
+    await cleanup_empty_offserver_groups(dry_run)
 
 
-def cleanup_empty_offserver_groups(dry_run):
+async def cleanup_empty_offserver_groups(dry_run):
     """Delete off-server groups that have no child monitors.
 
     Empties caused by this run are caught next run (monitor_list isn't refreshed
@@ -720,20 +1030,20 @@ def cleanup_empty_offserver_groups(dry_run):
     for m in monitor_list.values():
         p = m.get("parent")
         if p is not None:
-            child_count[int(p)] = child_count.get(int(p), 0) + 1
+            child_count[p] = child_count.get(p, 0) + 1
 
     for gid in offserver_group_ids():
         if gid == override:
             continue
         if child_count.get(gid, 0) == 0:
-            name = monitor_list.get(str(gid), {}).get("name", str(gid))
+            name = monitor_list.get(gid, {}).get("name", str(gid))
             if dry_run:
                 print(f"  Would delete empty off-server group: '{name}' [{gid}]")
-            elif delete_monitor(gid, f"group '{name}'"):
-                time.sleep(0.2)
+            elif await delete_monitor(gid, f"group '{name}'"):
+                await asyncio.sleep(0.2)
 
 
-def reconcile_state(name, info, mon, dns_state, dry_run):
+async def reconcile_state(name, info, mon, dns_state, dry_run):
     """Apply off-server and suspended policy to one monitor (cleanup).
 
     Handles pause/suffix, off-server-group move (move action) and deletion, plus
@@ -797,7 +1107,7 @@ def reconcile_state(name, info, mon, dns_state, dry_run):
         if dry_run:
             print(f"  Would delete: {name} ({'/'.join(reason)})")
             return True
-        return delete_monitor(mon["id"], name)
+        return await delete_monitor(mon["id"], name)
 
     is_tp = is_tool_paused_name(mon["name_raw"])
     off_ids = offserver_group_ids()
@@ -808,7 +1118,7 @@ def reconcile_state(name, info, mon, dns_state, dry_run):
     move_kind = None
     move_label = None
     if move_to_offgroup:
-        tgid, move_label = offserver_group_for(info, create=False)
+        tgid, move_label = await offserver_group_for(info, create=False)
         if tgid is None or mon["parent"] != tgid:
             move_kind = "offserver"
     elif is_tp and not paused and mon["parent"] in off_ids:
@@ -839,11 +1149,11 @@ def reconcile_state(name, info, mon, dns_state, dry_run):
 
     edits = {}
     if move_kind == "offserver":
-        gid = offserver_group_for(info, create=True)[0]
+        gid = (await offserver_group_for(info, create=True))[0]
         if gid is not None and gid != mon["parent"]:
             edits["parent"] = gid
     elif move_kind == "owner":
-        gid = ensure_group(owner_group_spec(info))
+        gid = await ensure_group(owner_group_spec(info))
         if gid is not None and gid != mon["parent"]:
             edits["parent"] = gid
     if mon["name_raw"] != desired_name:
@@ -851,24 +1161,147 @@ def reconcile_state(name, info, mon, dns_state, dry_run):
 
     ok = True
     if edits:
-        ok = edit_monitor(mon["bean"], **edits)
+        ok = await edit_monitor(mon["bean"], **edits)
     if ok and "pause" in ops:
-        pause_monitor(mon["id"])
+        await pause_monitor(mon["id"])
     if ok and "resume" in ops:
-        resume_monitor(mon["id"])
+        await resume_monitor(mon["id"])
     if ok:
-        print(f"  {name}{tag}: {', '.join(ops)}")
+        log_line(f"  {name}{tag}: {', '.join(ops)}")
     return ok
 
 
-def cmd_info():
+# -----------------------------------------------------------------------------
+# Daemon mode (persistent connection)
+# -----------------------------------------------------------------------------
+def daemon_socket_path():
+    return config.get("daemon_socket") or "/run/uptime-kuma-sync.sock"
+
+
+async def dispatch(action, dry_run=False):
+    """Run one command (shared by the CLI path and the daemon)."""
+    if action == "info":
+        await cmd_info()
+    elif action == "sync":
+        await cmd_sync(dry_run=dry_run)
+    elif action == "list":
+        await cmd_list()
+    elif action == "cleanup":
+        await cmd_cleanup(dry_run=dry_run)
+    else:
+        print(f"ERROR: Unknown action '{action}'")
+
+
+async def cmd_daemon():
+    """Keep the authenticated connection open and serve commands over a Unix socket.
+
+    Every normal invocation pays TCP+TLS+websocket upgrade+login+monitorList
+    (easily 0.5-2s) before doing any work. The daemon pays it once; later
+    invocations detect the socket, forward their command as one JSON line and
+    stream the output back (see try_daemon). Commands are serialized - they
+    share the global monitor list - and the per-run group caches are cleared
+    between requests so external group changes aren't acted on stale.
+
+    The daemon's client is built with reconnection disabled: Kuma auth is
+    per-connection, so a silent reconnect would leave the daemon holding a
+    connected-but-unauthenticated socket and a stale monitor list while
+    clients keep forwarding to it. Instead, the first dropped connection
+    makes the daemon exit and remove its socket, and clients fall back to
+    the direct-connect path.
+    """
+    sock_path = daemon_socket_path()
+    try:
+        os.unlink(sock_path)  # stale socket from a dead daemon
+    except OSError:
+        pass
+
+    lock = asyncio.Lock()
+
+    async def handle(reader, writer):
+        try:
+            request = json.loads((await reader.readline()).decode() or "{}")
+        except (ValueError, UnicodeDecodeError):
+            request = {}
+        async with lock:
+            _reseller_group_cache.clear()
+            _offserver_group_cache.clear()
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                try:
+                    await dispatch(request.get("action"), bool(request.get("dry_run")))
+                except SystemExit:
+                    pass
+                except Exception as e:
+                    print(f"ERROR: {e}")
+                finally:
+                    # A command that died mid-bulk-loop may leave buffered
+                    # progress lines; flush them into THIS response rather
+                    # than leaking them into the next one.
+                    flush_log()
+            writer.write(out.getvalue().encode())
+        try:
+            await writer.drain()
+            writer.close()
+        except ConnectionError:
+            pass
+
+    stop = asyncio.Event()
+
+    async def on_daemon_disconnect():
+        await on_disconnect()  # keep the usual log line
+        stop.set()
+
+    sio.on("disconnect", on_daemon_disconnect)
+
+    server = await asyncio.start_unix_server(handle, path=sock_path)
+    os.chmod(sock_path, 0o600)
+    print(f"  Daemon listening on {sock_path} (Ctrl+C to stop)")
+    try:
+        async with server:
+            await stop.wait()
+            print("  Connection lost, daemon exiting "
+                  "(further invocations use direct connect)")
+    finally:
+        try:
+            os.unlink(sock_path)
+        except OSError:
+            pass
+
+
+def try_daemon(action, dry_run):
+    """Forward the command to a running daemon. True when it was handled there."""
+    sock_path = daemon_socket_path()
+    if not os.path.exists(sock_path):
+        return False
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(5)
+    try:
+        client.connect(sock_path)
+    except OSError:
+        client.close()
+        return False  # stale socket -> direct-connect path
+    try:
+        client.settimeout(None)  # commands may legitimately take minutes
+        client.sendall((json.dumps({"action": action, "dry_run": dry_run}) + "\n").encode())
+        client.shutdown(socket.SHUT_WR)
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            sys.stdout.write(chunk.decode(errors="replace"))
+    finally:
+        client.close()
+    return True
+
+
+async def cmd_info():
     """List available groups and notifications to help with setup."""
     # Groups (monitors of type "group")
     print("=== Available monitor groups ===")
     groups_found = False
     for monitor_id, monitor in monitor_list.items():
         if monitor.get("type") == "group":
-            print(f"  ID: {int(monitor_id):3d}  Name: {monitor['name']}")
+            print(f"  ID: {monitor_id:3d}  Name: {monitor['name']}")
             groups_found = True
     if not groups_found:
         print("  No groups found. Create a group in Uptime Kuma first.")
@@ -886,43 +1319,53 @@ def cmd_info():
 # -----------------------------------------------------------------------------
 # Main
 # -----------------------------------------------------------------------------
-def main():
+async def main():
     global config
 
     parser = argparse.ArgumentParser(description="Uptime Kuma sync (called by wrapper)")
-    parser.add_argument("--action", required=True, choices=["sync", "list", "cleanup", "info"])
+    parser.add_argument("--action", required=True,
+                        choices=["sync", "list", "cleanup", "info", "daemon"])
     parser.add_argument("--config", required=True, help="JSON config string")
     parser.add_argument("--dry-run", action="store_true", help="Preview only")
 
     args = parser.parse_args()
     config = json.loads(args.config)
 
-    # Connect
+    # A running daemon already holds an authenticated connection - use it.
+    if args.action != "daemon" and try_daemon(args.action, args.dry_run):
+        return
+
+    # Connect (the daemon must not auto-reconnect, see make_client)
+    make_client(reconnection=args.action != "daemon")
     print(f"Connecting to {config['url']}...")
     try:
-        sio.connect(config["url"], transports=["websocket"])
+        await sio.connect(config["url"], transports=["websocket"])
     except Exception as e:
         print(f"ERROR: Connection failed: {e}")
         sys.exit(1)
 
-    time.sleep(2)  # Wait for server to be ready
-
-    authenticate()
-    print("  Loading monitors...")
-    time.sleep(1)
+    # The server pushes monitorList right after a successful login on this
+    # same connection, so arm the wait before the login call: the push races
+    # the login ack and the critical path becomes max(login, monitorList)
+    # instead of their sum. The generous timeout covers authenticate's
+    # worst-case retry cycle. authenticate() stays awaited from the main task
+    # (not inside a gather) so its sys.exit on failure remains one clean
+    # ERROR line instead of an unretrieved-task traceback; asyncio.run
+    # cancels the armed wait on exit. (No settle sleep after connect either -
+    # a completed websocket handshake means it's ready.)
+    wait_task = asyncio.create_task(wait_for_monitor_list(timeout=60))
+    await authenticate()
+    await wait_task
 
     try:
-        if args.action == "info":
-            cmd_info()
-        elif args.action == "sync":
-            cmd_sync(dry_run=args.dry_run)
-        elif args.action == "list":
-            cmd_list()
-        elif args.action == "cleanup":
-            cmd_cleanup(dry_run=args.dry_run)
+        if args.action == "daemon":
+            await cmd_daemon()
+        else:
+            await dispatch(args.action, dry_run=args.dry_run)
     finally:
-        sio.disconnect()
+        flush_log()
+        await sio.disconnect()
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -21,6 +21,7 @@ ENV_FILE="$INSTALL_DIR/.env"
 PYTHON_SCRIPT="$INSTALL_DIR/uptime-kuma-sync.py"
 VENV_DIR="$INSTALL_DIR/venv"
 DOMAINS_FILE="$INSTALL_DIR/domains-list"
+TOKEN_FILE="$INSTALL_DIR/.jwt_token"
 LOG_FILE="$INSTALL_DIR/uptime-kuma-sync.log"
 SELF_SCRIPT="$INSTALL_DIR/uptime-kuma-sync.sh"
 
@@ -323,7 +324,7 @@ cmd_update() {
 
     # Upgrade pip itself, then deps
     "$VENV_DIR/bin/pip" install --upgrade pip -q
-    "$VENV_DIR/bin/pip" install --upgrade "python-socketio[client]" websocket-client dnspython -q
+    "$VENV_DIR/bin/pip" install --upgrade "python-socketio[asyncio_client]" dnspython orjson -q
 
     # Add any newly-introduced config keys to an existing .env
     ensure_env_keys
@@ -357,7 +358,7 @@ setup_venv() {
 
     log "Installing Python dependencies..."
     "$VENV_DIR/bin/pip" install --upgrade pip -q
-    "$VENV_DIR/bin/pip" install --upgrade "python-socketio[client]" websocket-client dnspython -q
+    "$VENV_DIR/bin/pip" install --upgrade "python-socketio[asyncio_client]" dnspython orjson -q
 }
 
 # -----------------------------------------------------------------------------
@@ -455,6 +456,7 @@ run_python() {
     "username": "$USERNAME",
     "password": "$PASSWORD",
     "domains_file": "$DOMAINS_FILE",
+    "token_file": "$TOKEN_FILE",
     "parent_group_id": $PARENT_GROUP_ID,
     "notification_ids": [$(echo "$DEFAULT_NOTIFICATION_IDS" | tr ' ' ',')],
     "monitor_interval": $MONITOR_INTERVAL,
@@ -551,6 +553,17 @@ cmd_info() {
     run_python info
 }
 
+cmd_daemon() {
+    check_config
+    ensure_installed
+
+    # The daemon serves later --sync/--list/--cleanup invocations over a Unix
+    # socket, skipping the per-invocation connect+login (those commands still
+    # refresh the domains list themselves before forwarding).
+    list_plesk_domains
+    run_python daemon
+}
+
 # -----------------------------------------------------------------------------
 # Usage
 # -----------------------------------------------------------------------------
@@ -569,6 +582,8 @@ Commands:
     --cleanup           Remove obsolete monitors
     --cleanup --dry-run Preview monitors that would be removed
     --info              Show available groups and notifications
+    --daemon            Keep an authenticated connection open; later
+                        invocations reuse it (faster scripted loops)
     --cron              Install cron job (sync + cleanup)
     --uncron            Remove cron job
     -h, --help          Show this help
@@ -598,6 +613,7 @@ case "${1:---help}" in
         ;;
     --list)             cmd_list ;;
     --info)             cmd_info ;;
+    --daemon)           cmd_daemon ;;
     --cleanup)
         if [[ "${2:-}" == "--dry-run" ]]; then
             cmd_cleanup true